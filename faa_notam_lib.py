@@ -1,9 +1,91 @@
+import hashlib
+import os
 import re
+import tempfile
+import threading
+import orjson
 import requests
 import time
 import urllib3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# The staging API is queried with verify=False; disable the per-request
+# InsecureRequestWarning once at import so the warning machinery doesn't
+# run on every call in the fetch loop.
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# Patterns used on every feature — compiled once so the per-item loop never
+# pays re-parse or re-cache-lookup cost.
+_RWY_WORD_RE = re.compile(r"\bRWY\b|\bRUNWAY\b")
+_TOKEN_RE = re.compile(r"[A-Z0-9/]+")
+# Designator suffixes accepted after a runway number (e.g. 07L for query 07).
+_RWY_SUFFIXES = ('L', 'R', 'C')
+# Stripping three fixed characters is a C-level table translate, no regex needed.
+_DATE_STRIP_TABLE = str.maketrans('', '', '-:T')
+
+
+@lru_cache(maxsize=256)
+def _runway_num_re(query_upper):
+    """Compiled boundary pattern for a runway number query (e.g. '07')."""
+    return re.compile(r"(?<!\d)" + re.escape(query_upper) + r"(?![0-9])")
+
+
+def _icao_date(dt_str):
+    """Convert an ISO timestamp to the 10-digit ICAO B)/C) date format."""
+    if not dt_str:
+        return "PERM"
+    return str(dt_str).translate(_DATE_STRIP_TABLE)[2:12]
+
+@dataclass(slots=True)
+class _Notam:
+    """Internal NOTAM record used during filtering/dedup.
+
+    Slotted attribute access is cheaper than dict items and the object is
+    several times smaller, which matters when hundreds of candidates churn
+    through the dedup buckets. Converted to plain dicts only for survivors.
+    """
+    id: str
+    location: str
+    start: str
+    end: str
+    issued: str
+    text: str
+    full_icao: str
+    status: str
+    q_line: str
+    schedule: str
+    keyword: str
+    classification: str
+    n_key: tuple
+    norm_text: str
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "location": self.location,
+            "start": self.start,
+            "end": self.end,
+            "issued": self.issued,
+            "text": self.text,
+            "full_icao": self.full_icao,
+            "status": self.status,
+            "q_line": self.q_line,
+            "schedule": self.schedule,
+            "keyword": self.keyword,
+            "classification": self.classification,
+        }
+
 
 class FAAClient:
+    # Shared across all instances (and threads) so concurrently built
+    # clients with the same credentials never fetch duplicate tokens.
+    _token_cache = {}
+    _token_lock = threading.Lock()
+
     def __init__(self, client_id, client_secret):
         self.client_id = client_id
         self.client_secret = client_secret
@@ -11,17 +93,75 @@ class FAAClient:
         self._access_token = None
         self._expires_at = 0
         self.session = requests.Session()
+        # Pooled keep-alive connections + retries: repeat airport lookups
+        # reuse the TLS connection instead of handshaking per request, and
+        # transient 5xx from the staging API no longer surface as failures.
+        retry_strategy = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=["GET", "POST"]
+        )
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=retry_strategy)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+
+    def _token_cache_path(self):
+        # Keyed by a hash of the client id so different credentials never
+        # share a cache file (and the id itself is not written to disk).
+        digest = hashlib.sha256(str(self.client_id).encode()).hexdigest()[:16]
+        return os.path.join(tempfile.gettempdir(), f"faa_token_{digest}.json")
+
+    def _load_cached_token(self):
+        """Reuse a still-valid token from disk (5-min safety buffer)."""
+        try:
+            with open(self._token_cache_path(), 'rb') as f:
+                data = orjson.loads(f.read())
+            if time.time() < (data['expires_at'] - 300):
+                self._access_token = data['access_token']
+                self._expires_at = data['expires_at']
+                return True
+        except (OSError, ValueError, KeyError):
+            pass
+        return False
+
+    def _save_cached_token(self):
+        try:
+            path = self._token_cache_path()
+            with open(path, 'wb') as f:
+                f.write(orjson.dumps({'access_token': self._access_token, 'expires_at': self._expires_at}))
+            os.chmod(path, 0o600)
+        except OSError:
+            pass  # cache is best-effort; auth still works without it
+
+    def _adopt_shared_token(self):
+        cached = FAAClient._token_cache.get(self.client_id)
+        if cached and time.time() < (cached[1] - 60):
+            self._access_token, self._expires_at = cached
+            return True
+        return False
 
     def _authenticate(self):
         if self._access_token and time.time() < (self._expires_at - 60):
             return
-        url = f"{self.base_url}/v1/auth/token"
-        payload = {'grant_type': 'client_credentials'}
-        response = self.session.post(url, data=payload, auth=(self.client_id, self.client_secret), verify=False, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        self._access_token = data['access_token']
-        self._expires_at = int(time.time()) + int(data.get('expires_in', 1799))
+        if self._adopt_shared_token():
+            return
+        with FAAClient._token_lock:
+            # Another thread may have refreshed while we waited on the lock.
+            if self._adopt_shared_token():
+                return
+            # Streamlit reruns rebuild clients and would otherwise discard a
+            # perfectly valid token; check the disk cache before re-posting.
+            if not self._load_cached_token():
+                url = f"{self.base_url}/v1/auth/token"
+                payload = {'grant_type': 'client_credentials'}
+                response = self.session.post(url, data=payload, auth=(self.client_id, self.client_secret), verify=False, timeout=30)
+                response.raise_for_status()
+                data = response.json()
+                self._access_token = data['access_token']
+                self._expires_at = int(time.time()) + int(data.get('expires_in', 1799))
+                self._save_cached_token()
+            FAAClient._token_cache[self.client_id] = (self._access_token, self._expires_at)
 
     def get_raw_notams(self, location=None):
         self._authenticate()
@@ -30,25 +170,71 @@ class FAAClient:
         headers = {
             "Authorization": f"Bearer {self._access_token}",
             "nmsResponseFormat": "GEOJSON",
-            "Accept": "application/json"
+            "Accept": "application/json",
+            # Ask for compressed transfer explicitly; urllib3 ungzips into
+            # response.content (bytes) which feeds orjson with no str detour.
+            "Accept-Encoding": "gzip"
         }
         response = self.session.get(endpoint, params=params, headers=headers, verify=False, timeout=30)
         response.raise_for_status()
-        return response.json()
+        # NOTAM GeoJSON payloads run to multiple MB; orjson parses them
+        # several times faster than the stdlib parser behind response.json().
+        return orjson.loads(response.content)
+
+    def search_notams_bulk(self, locations, **kwargs):
+        """
+        Fetch NOTAMs for several locations concurrently.
+
+        Requests overlap on the pooled keep-alive connections, so total
+        latency approaches the slowest single lookup instead of the sum.
+        Returns {location: notam_list}; a failed location maps to [].
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            futures = {
+                executor.submit(self.search_notams, loc, **kwargs): loc
+                for loc in locations
+            }
+            for future in as_completed(futures):
+                loc = futures[future]
+                try:
+                    results[loc] = future.result()
+                except Exception:
+                    results[loc] = []
+        return results
 
-    def search_notams(self, location, query="", search_type="keyword", is_regex=False):
+    def search_notams(self, location, query="", search_type="keyword", is_regex=False, projection=None):
         """
         Search and filter NOTAMs with robust deduplication.
+
+        projection: optional iterable of field names (e.g. ('id', 'location')).
+        When given, only those fields are returned per NOTAM and the heavy
+        Q-line reconstruction plus the text-similarity dedup are skipped —
+        dedup falls back to the composite key alone, first hit wins.
         """
         raw_data = self.get_raw_notams(location)
         if raw_data.get('status') != "Success":
             return []
 
         features = raw_data.get('data', {}).get('geojson', [])
-        filtered_list = []
-        
+        # Dedup buckets keyed by the composite event signature (_n_key).
+        # Candidates with different keys can never merge, so each new NOTAM
+        # only has to be compared against its own (tiny) bucket.
+        buckets = {}
+        projected = []
+        seen_keys = set()
+
         query_str = str(query).strip()
-        query_upper = query_str.upper() if not is_regex else ""
+        query_upper = query_str.upper()
+
+        # Compile user-supplied regexes once per search instead of once per
+        # feature; a bad pattern degrades to a plain substring match below.
+        user_re = None
+        if is_regex and query_str:
+            try:
+                user_re = re.compile(query_str, re.IGNORECASE)
+            except re.error:
+                user_re = None
 
         for item in features:
             core = item.get('properties', {}).get('coreNOTAMData', {})
@@ -57,35 +243,59 @@ class FAAClient:
             translations = core.get('notamTranslation', [])
             formatted = translations[0].get('formattedText', '') if translations else ''
             
-            full_text = f"{raw_text} {formatted}".upper()
             is_match = False
-            
+
             if not query_str or search_type == "all":
                 is_match = True
-            elif search_type == "runway":
-                has_rwy_word = re.search(r"\bRWY\b|\bRUNWAY\b", full_text)
-                if is_regex:
-                    has_number = re.search(query_str, full_text, re.IGNORECASE)
-                else:
-                    number_pattern = r"(?<!\d)" + re.escape(query_upper) + r"(?![0-9])"
-                    has_number = re.search(number_pattern, full_text)
-                if has_rwy_word and has_number:
-                    is_match = True
-            else: # keyword search
-                if is_regex:
-                    try:
-                        if re.search(query_str, full_text, re.IGNORECASE):
-                            is_match = True
-                    except re.error:
-                        if query_upper in full_text: is_match = True
-                else:
-                    if query_upper in full_text:
+            else:
+                # Search the raw text and the translation separately instead
+                # of allocating a concatenated uppercase copy per feature;
+                # the second haystack is only touched when the first misses.
+                hay1 = raw_text.upper()
+                if search_type == "runway":
+                    hay2 = formatted.upper() if formatted else ""
+                    has_rwy_word = _RWY_WORD_RE.search(hay1) or (hay2 and _RWY_WORD_RE.search(hay2))
+                    if not has_rwy_word:
+                        has_number = None
+                    elif is_regex:
+                        has_number = user_re and (user_re.search(hay1) or (hay2 and user_re.search(hay2)))
+                    else:
+                        # Tokenize once and test set membership instead of a
+                        # lookaround regex scan per feature. '07' matches the
+                        # bare number, designator forms (07L/07R/07C) and
+                        # paired designators like 07/25.
+                        tokens = set(_TOKEN_RE.findall(hay1))
+                        if hay2:
+                            tokens.update(_TOKEN_RE.findall(hay2))
+                        has_number = query_upper in tokens or any(
+                            t.startswith(query_upper) and
+                            (t[len(query_upper):len(query_upper) + 1] in _RWY_SUFFIXES or
+                             t[len(query_upper):len(query_upper) + 1] == '/')
+                            for t in tokens
+                        )
+                        if not has_number:
+                            # Fallback for joined forms such as RWY07L where
+                            # the number is embedded inside a larger token.
+                            num_re = _runway_num_re(query_upper)
+                            has_number = num_re.search(hay1) or (hay2 and num_re.search(hay2))
+                    if has_rwy_word and has_number:
                         is_match = True
+                else: # keyword search
+                    # Uppercase the translation lazily — most features are
+                    # decided by the raw text alone.
+                    if is_regex and user_re is not None:
+                        if user_re.search(hay1) or (formatted and user_re.search(formatted.upper())):
+                            is_match = True
+                    else:
+                        if query_upper in hay1 or (formatted and query_upper in formatted.upper()):
+                            is_match = True
 
             if is_match:
                 # ID Reconstruction logic
-                series = str(core.get('notam', {}).get('series') or "").strip()
-                raw_num = str(core.get('notam', {}).get('number', '0000')).strip()
+                # These fields arrive from the JSON parser as str (or None),
+                # so coerce only the genuinely numeric-prone ones below.
+                series = (notam_info.get('series') or "").strip()
+                raw_num = str(notam_info.get('number', '0000')).strip()
                 number = raw_num
                 if series and raw_num.startswith(series):
                     number = raw_num[len(series):]
@@ -96,23 +306,18 @@ class FAAClient:
                     if len(parts) == 2 and parts[1].isdigit() and len(parts[1]) <= 2:
                         number = parts[0]
                 
-                raw_year = str(core.get('notam', {}).get('year', '')).strip()
+                raw_year = str(notam_info.get('year', '')).strip()
                 year = raw_year[-2:] if len(raw_year) > 2 else raw_year
                 if not year: year = "26" 
                 
-                type_code = core.get('notam', {}).get('type', 'N')
+                type_code = notam_info.get('type', 'N')
                 if type_code == 'C': continue 
                 
-                def icao_date(dt_str):
-                    if not dt_str: return "PERM"
-                    clean = re.sub(r'[-:T]', '', str(dt_str))
-                    return clean[2:12]
-
-                effective_start = str(notam_info.get('effectiveStart') or "")
-                effective_end = str(notam_info.get('effectiveEnd') or "")
+                effective_start = notam_info.get('effectiveStart') or ""
+                effective_end = notam_info.get('effectiveEnd') or ""
                 classification = notam_info.get('classification', 'DOM')
-                
-                loc_str = str(notam_info.get('location') or "").upper()
+
+                loc_str = (notam_info.get('location') or "").upper()
                 # Normalize location for dedup (JFK -> KJFK)
                 norm_loc = loc_str if loc_str.startswith('K') and len(loc_str) == 4 else (f"K{loc_str}" if len(loc_str) == 3 else loc_str)
 
@@ -127,6 +332,25 @@ class FAAClient:
                     q_code
                 )
 
+                if projection is not None:
+                    # Light path: no Q-line reconstruction, no similarity
+                    # dedup — the first NOTAM per composite key wins.
+                    if n_key in seen_keys:
+                        continue
+                    seen_keys.add(n_key)
+                    record = {
+                        "id": f"{series}{number}/{year} NOTAM{type_code}",
+                        "location": loc_str,
+                        "start": _icao_date(effective_start),
+                        "end": _icao_date(effective_end),
+                        "text": raw_text,
+                        "status": notam_info.get('status', 'Active'),
+                        "keyword": q_code,
+                        "classification": classification,
+                    }
+                    projected.append({k: record[k] for k in projection if k in record})
+                    continue
+
                 # Q-line Reconstruction
                 fir = notam_info.get('affectedFir', 'XXXX')
                 traffic = notam_info.get('traffic', 'IV')
@@ -139,56 +363,59 @@ class FAAClient:
                 q_coord = f"{coord}{str(radius).zfill(3)}" if coord else "XXXXX/..."
                 q_line = f"Q) {fir}/{q_code}/{traffic}/{purpose}/{scope}/{low}/{high}/{q_coord}"
 
-                new_notam = {
-                    "id": f"{series}{number}/{year} NOTAM{type_code}",
-                    "location": loc_str,
-                    "start": icao_date(effective_start),
-                    "end": icao_date(effective_end),
-                    "issued": str(notam_info.get('issued') or ""),
-                    "text": raw_text,
-                    "full_icao": formatted,
-                    "status": notam_info.get('status', 'Active'),
-                    "q_line": q_line,
-                    "schedule": core.get('notam', {}).get('schedule', ''),
-                    "keyword": q_code,
-                    "classification": classification,
-                    "_n_key": n_key
-                }
+                # Normalized once per NOTAM; the old per-pair strip().upper()
+                # was the expensive part of the quadratic dedup scan.
+                norm_text = raw_text.strip().upper()
+
+                new_notam = _Notam(
+                    id=f"{series}{number}/{year} NOTAM{type_code}",
+                    location=loc_str,
+                    start=_icao_date(effective_start),
+                    end=_icao_date(effective_end),
+                    issued=notam_info.get('issued') or "",
+                    text=raw_text,
+                    full_icao=formatted,
+                    status=notam_info.get('status', 'Active'),
+                    q_line=q_line,
+                    schedule=notam_info.get('schedule', ''),
+                    keyword=q_code,
+                    classification=classification,
+                    n_key=n_key,
+                    norm_text=norm_text
+                )
 
+                bucket = buckets.setdefault(n_key, [])
                 existing_idx = None
-                for i, existing in enumerate(filtered_list):
-                    if existing['_n_key'] == new_notam['_n_key']:
-                        # Stage 1: The composite signature perfectly matched.
-                        # Stage 2: Classification Check
-                        if existing['classification'] != new_notam['classification']:
-                            # Stage 2A: One DOM, One INTL. Guaranteed true pair noise.
+                for i, existing in enumerate(bucket):
+                    # Stage 1: The composite signature perfectly matched (same bucket).
+                    # Stage 2: Classification Check
+                    if existing.classification != new_notam.classification:
+                        # Stage 2A: One DOM, One INTL. Guaranteed true pair noise.
+                        existing_idx = i
+                        break
+                    else:
+                        # Stage 2B: Same classification (e.g., both INTL).
+                        # This could be the "Multiple Cranes" distinct event edge case.
+                        # Conservative Approach: Only merge if the text is a 100% exact match.
+                        if existing.norm_text == norm_text:
                             existing_idx = i
                             break
-                        else:
-                            # Stage 2B: Same classification (e.g., both INTL).
-                            # This could be the "Multiple Cranes" distinct event edge case.
-                            t1 = existing['text'].strip().upper()
-                            t2 = new_notam['text'].strip().upper()
-                            
-                            # Conservative Approach: Only merge if the text is a 100% exact match.
-                            if t1 == t2:
-                                existing_idx = i
-                                break
-                
+
                 if existing_idx is not None:
-                    existing_item = filtered_list[existing_idx]
+                    existing_item = bucket[existing_idx]
                     # Strict Priority: INTL always wins over DOM
-                    if new_notam['classification'] == 'INTL' and existing_item['classification'] != 'INTL':
-                        filtered_list[existing_idx] = new_notam
+                    if new_notam.classification == 'INTL' and existing_item.classification != 'INTL':
+                        bucket[existing_idx] = new_notam
                     # If same classification, prefer the shorter/cleaner ID format
-                    elif new_notam['classification'] == existing_item['classification']:
-                        if len(new_notam['id']) < len(existing_item['id']):
-                            filtered_list[existing_idx] = new_notam
+                    elif new_notam.classification == existing_item.classification:
+                        if len(new_notam.id) < len(existing_item.id):
+                            bucket[existing_idx] = new_notam
                 else:
-                    filtered_list.append(new_notam)
+                    bucket.append(new_notam)
 
-        # Cleanup internal keys
-        for n in filtered_list:
-            n.pop('_n_key', None)
-            
-        return filtered_list
\ No newline at end of file
+        if projection is not None:
+            return projected
+
+        # Dicts are only materialized for the survivors; dedup losers never
+        # pay for one.
+        return [n.as_dict() for bucket in buckets.values() for n in bucket]
\ No newline at end of file
@@ -3,18 +3,16 @@ TAF Information Dashboard - Main Application
 Aviation weather monitoring dashboard for airports and EDTO ERAs
 """
 
+import re
 import streamlit as st
 from datetime import datetime
 import streamlit.components.v1 as components
-from streamlit_autorefresh import st_autorefresh
 from taf_functions import (
     load_region_data, load_airport_data, load_enroute_alternates,
     process_destinations_data, process_enroute_data, display_tables,
-    highlight_notam_text
+    highlight_notam_text, fetch_taf
 )
 from faa_notam_lib import FAAClient
-import os
-import time
 
 # Set the page config to wide mode
 st.set_page_config(layout="wide", page_title="TAF Information Dashboard", page_icon="✈️")
@@ -22,6 +20,134 @@ st.set_page_config(layout="wide", page_title="TAF Information Dashboard", page_i
 # Auto-refresh logic moved to bottom of main() to avoid top-padding issues
 
 
+# Invariant NOTAM console cell styles, interpolated once at import instead of
+# per table cell on every rerun.
+_TD_STYLE_FMT = (
+    'width: 33.33%; padding: 10px; vertical-align: top; background-color: {bg}; '
+    'border-left: {border}; border-top: 1px solid #dee2e6; '
+    'font-family: monospace !important; font-size: 13px !important; '
+    'line-height: 1.3 !important; color: #333;'
+)
+_TD_STYLE_TOP = _TD_STYLE_FMT.format(bg="#fff0f0", border="4px solid #d9534f")
+_TD_STYLE_RWY = _TD_STYLE_FMT.format(bg="#fffaf0", border="4px solid #f0ad4e")
+_TD_STYLE_DEFAULT = _TD_STYLE_FMT.format(bg="#ffffff", border="1px solid #dee2e6")
+_TD_FILLER = '<td style="width: 33.33%; border: none;"></td>'
+
+# NOTAM prioritization constants (hot path: evaluated once per NOTAM per sort)
+_RWY_MENTION_RE = re.compile(r'\b(RWY|RUNWAY)')
+_CRIT_TOKENS = ("CLOSED", "CLSD", "U/S", "UNSERVICEABLE")
+_TOP_SUBJECTS = frozenset({"MR", "FA"})
+# Q-code embedded in an ICAO Q-line, e.g. "Q) ZWUQ/QMRLC/IV/..."
+_Q_LINE_CODE_RE = re.compile(r'/(Q[A-Z]{4})')
+
+# NOTAMs rendered up front; lower-priority ones go behind an expander
+_NOTAM_HEAD_COUNT = 30
+
+# Mock NOTAMs used when no FAA credentials are configured. Built once;
+# the console patches in the requested location per render.
+_MOCK_NOTAMS_TEMPLATE = (
+    {
+        "id": "W0164/26 NOTAMN",
+        "status": "Active", "start": "2602231700", "end": "2603302200",
+        "text": "RWY08L/26R CLSD DUE TO MAINT.",
+        "full_icao": "GEOJSON",
+        "q_line": "Q) <LOC>/QMRLC/IV/NBO/A/000/999/4354N08728E005",
+        "schedule": "1700-2200 EVERY MON",
+        "keyword": "QMRLC"
+    },
+    {
+        "id": "B9999/26 NOTAMN",
+        "status": "Active", "start": "2602250000", "end": "2602252359",
+        "text": "AERODROME CLOSED DUE TO SNOW.",
+        "full_icao": "GEOJSON",
+        "q_line": "Q) <LOC>/QFAXX/IV/NBO/A/000/999/...",
+        "schedule": "",
+        "keyword": "QFAXX"
+    },
+)
+
+
+# Compact header styling + title, built once at import instead of
+# reconstructed inside main() on every rerun.
+_HEADER_MARKDOWN = """
+    <style>
+        /* Modern UI: Strip all top padding/headers for absolute compactness */
+        [data-testid="stHeader"] {
+            display: none;
+        }
+        .main .block-container {
+            padding-top: 0rem !important;
+            padding-bottom: 1rem;
+        }
+        h1 {
+            margin-top: 0rem !important;
+            margin-bottom: 0.5rem !important;
+            font-size: 2rem !important;
+        }
+        .stSelectbox, .stCheckbox {
+            margin-bottom: 0.25rem !important;
+        }
+    </style>
+    <h1>TAF Information Dashboard</h1>
+    """
+
+
+def annotate_notams(notams):
+    """Single pass stashing `_subject` and `_upper_text` on each NOTAM.
+
+    Both the sort metrics and the render loop need the Q-code subject and
+    the uppercased text; computing them once here avoids repeating the
+    substring/upper/regex work per consumer. Falls back to parsing the
+    Q-line when the FAA response carries no `keyword`.
+    """
+    for n in notams:
+        q = n.get('keyword')
+        if not q:
+            m = _Q_LINE_CODE_RE.search(n.get('q_line', ''))
+            q = m.group(1) if m else ""
+        # Subject = 2nd & 3rd letter of the Q-code (MR = Runway, FA = Aerodrome)
+        n['_subject'] = q[1:3] if len(q) >= 3 else ""
+        n['_upper_text'] = n['text'].upper()
+
+
+def get_notam_metrics(n):
+    """Compute the (priority, issued, subject, rwy_mention) sort metrics"""
+    text = n['_upper_text']
+
+    # Tier 0: Critical Ops via Q-code subject (annotated up front)
+    subject = n['_subject']
+    is_top_priority = subject in _TOP_SUBJECTS
+
+    # Tier 1: Critical status
+    is_crit = any(x in text for x in _CRIT_TOKENS)
+
+    # Tier 2: General runway mentions
+    is_rwy_mention = bool(_RWY_MENTION_RE.search(text))
+
+    # Secondary Sort Key: Issue Date. "2025-05-16T15:37:00Z" is ISO-8601,
+    # so the raw string compares identically to the parsed timestamp —
+    # no strptime needed; the sort below handles the descending order.
+    issued_str = n.get('issued', '')
+
+    # Priority Score (Primary Sort Key: Lower is higher)
+    if is_top_priority: return 0, issued_str, subject, is_rwy_mention
+    if is_crit: return 1, issued_str, subject, is_rwy_mention
+    if is_rwy_mention: return 2, issued_str, subject, is_rwy_mention
+    return 3, issued_str, subject, is_rwy_mention
+
+
+@st.cache_resource
+def get_faa_client():
+    """Process-wide FAA client (shared connection pool and token state)"""
+    return FAAClient(st.secrets.get("FAA_CLIENT_ID"), st.secrets.get("FAA_CLIENT_SECRET"))
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def cached_search_notams(location, query=""):
+    """Memoized NOTAM search so reruns within 5 minutes skip the API entirely"""
+    return get_faa_client().search_notams(location=location, query=query)
+
+
 def sync_params():
     """Sync session state to URL query parameters"""
     if "region_select" in st.session_state:
@@ -29,6 +155,18 @@ def sync_params():
     if "show_all_check" in st.session_state:
         st.query_params["show_all"] = str(st.session_state.show_all_check)
 
+def on_region_change():
+    """Close any open NOTAM console when the region changes, then sync URL.
+
+    Running this in the widget callback avoids the old compare-and-rerun
+    cycle, which executed the whole script a second time just to clear
+    the query parameter.
+    """
+    if "notam" in st.query_params:
+        del st.query_params["notam"]
+    st.session_state.selected_airport = None
+    sync_params()
+
 def on_direct_notam_submit():
     """Callback to handle direct airport/FIR NOTAM search"""
     direct_val = st.session_state.direct_notam_input.strip().upper()
@@ -42,18 +180,23 @@ def on_direct_notam_submit():
             del st.query_params["notam"]
         st.session_state.selected_airport = None
 
-def create_controls(region_data):
+@st.cache_data(show_spinner=False)
+def get_region_options(region_data):
+    """Sorted region names for the selector, computed once per config"""
+    return tuple(sorted(region_data))
+
+
+def create_controls(region_options):
     """Create the top horizontal control bar"""
     # Adjusted columns to fit the new search box (Region, Search, Show All, Refresh, Clock)
     col_control1, col_search, col_control2, col_control3, col_control4 = st.columns([1.5, 1.5, 2, 1.5, 1])
-    
+
     with col_control1:
-        region_options = sorted(list(region_data.keys()))
         selected_region = st.selectbox(
-            "🌍 Select Region", 
-            options=region_options, 
+            "🌍 Select Region",
+            options=region_options,
             key="region_select",
-            on_change=sync_params
+            on_change=on_region_change
         )
         
     with col_search:
@@ -79,6 +222,9 @@ def create_controls(region_data):
     with col_control3:
         st.markdown("<div style='margin-top: 28px;'></div>", unsafe_allow_html=True)
         if st.button("🔄 Refresh Now"):
+            # Drop only the cached TAF responses so the rerun refetches
+            # live data instead of replaying the 5-minute TTL cache
+            fetch_taf.clear()
             st.rerun()
     
     with col_control4:
@@ -88,60 +234,50 @@ def create_controls(region_data):
     return selected_region, show_all_airports
 
 
+@st.cache_data(show_spinner=False)
+def build_region_index(region_data):
+    """Build a region -> frozenset(airports) index, including the ALL union"""
+    index = {region: frozenset(airports) for region, airports in region_data.items()}
+    index["ALL"] = frozenset().union(*region_data.values()) if region_data else frozenset()
+    return index
+
+
+@st.cache_data(show_spinner=False)
 def get_filtered_airports(selected_region, region_data, airport_data):
     """Get filtered airport data based on selected region"""
-    if selected_region == "ALL":
-        relevant_airports = set()
-        for airports in region_data.values():
-            relevant_airports.update(airports)
-    else:
-        relevant_airports = region_data[selected_region]
-    
+    if selected_region in region_data:
+        # Iterate the (small) region list and look up in the dict, rather
+        # than scanning every configured airport with membership tests.
+        # The list keeps Region.txt order, so row order stays deterministic.
+        return {dest: airport_data[dest] for dest in region_data[selected_region] if dest in airport_data}
+    # "ALL" (or unknown region): the candidate set is the whole config, so
+    # the full scan in airport-list order is already the cheap path.
+    index = build_region_index(region_data)
+    relevant_airports = index.get(selected_region, frozenset())
     return {dest: alternates for dest, alternates in airport_data.items() if dest in relevant_airports}
 
 
 def main():
     """Main application function"""
     # Compact header with reduced spacing
-    st.markdown("""
-    <style>
-        /* Modern UI: Strip all top padding/headers for absolute compactness */
-        [data-testid="stHeader"] {
-            display: none;
-        }
-        .main .block-container {
-            padding-top: 0rem !important;
-            padding-bottom: 1rem;
-        }
-        /* Target the auto-refresh container to ensure it stays invisible and zero-height */
-        iframe[title="streamlit_autorefresh.st_autorefresh"] {
-            display: none;
-        }
-        h1 {
-            margin-top: 0rem !important;
-            margin-bottom: 0.5rem !important;
-            font-size: 2rem !important;
-        }
-        .stSelectbox, .stCheckbox {
-            margin-bottom: 0.25rem !important;
-        }
-    </style>
-    <h1>TAF Information Dashboard</h1>
-    """, unsafe_allow_html=True)
+    st.markdown(_HEADER_MARKDOWN, unsafe_allow_html=True)
     
-    # Ensure NOTAM client is initialized
-    if "notam_client" not in st.session_state:
-        client_id = st.secrets.get("FAA_CLIENT_ID")
-        client_secret = st.secrets.get("FAA_CLIENT_SECRET")
-        st.session_state.notam_client = FAAClient(client_id, client_secret)
+    # Determine mock mode once per session from the shared FAA client
+    # (setdefault: single session_state lookup; the default is just an
+    # attribute read off the cached client, safe to evaluate each rerun)
+    client_id = get_faa_client().client_id
+    st.session_state.setdefault("notam_is_mock", (not client_id) or client_id == "YOUR_CLIENT_ID")
     
+    # Load configuration data (cached; reparsed only when the files change)
+    region_data = load_region_data("./Region.txt")
+    airport_data = load_airport_data("./Airport_list.txt")
+    enroute_data = load_enroute_alternates("./Enroute_Alternates.txt")
+
     # --- URL & Session State Synchronization ---
+    region_options = get_region_options(region_data)
     if "initialized" not in st.session_state:
-        # Load data first to get available regions
-        temp_region_data = load_region_data("./Region.txt")
-        available_regions = sorted(list(temp_region_data.keys()))
-        default_region = available_regions[0] if available_regions else ""
-        
+        default_region = region_options[0] if region_options else ""
+
         # One-time initialization from URL parameters
         st.session_state.region_select = st.query_params.get("region", default_region)
         st.session_state.show_all_check = st.query_params.get("show_all", "False") == "True"
@@ -150,26 +286,12 @@ def main():
     # Sync selected airport from URL
     st.session_state.selected_airport = st.query_params.get("notam")
     # -------------------------------------------
-
-    # Load configuration data
-    region_data = load_region_data("./Region.txt")
-    airport_data = load_airport_data("./Airport_list.txt")
-    enroute_data = load_enroute_alternates("./Enroute_Alternates.txt")
     
     # Create controls and get user selections
-    selected_region, show_all_airports = create_controls(region_data)
+    selected_region, show_all_airports = create_controls(region_options)
     
-    # --- Auto-Cleanup Logic ---
-    # If region changes via selectbox, manually clear NOTAM to avoid ghost consoles
-    if "last_region" not in st.session_state:
-        st.session_state.last_region = selected_region
-    
-    if st.session_state.last_region != selected_region:
-        if "notam" in st.query_params:
-            del st.query_params["notam"]
-        st.session_state.selected_airport = None
-        st.session_state.last_region = selected_region
-        st.rerun()
+    # Region-change cleanup now happens inside on_region_change, so no
+    # last_region bookkeeping or second full rerun is needed here.
 
     # Filter airports based on selected region
     filtered_airport_data = get_filtered_airports(selected_region, region_data, airport_data)
@@ -180,15 +302,25 @@ def main():
         render_notam_console(st.session_state.selected_airport)
         st.divider()
 
-    # Process TAF data
-    destinations_rows = process_destinations_data(filtered_airport_data, airport_data, show_all_airports, selected_region)
+    # Process and display TAF data (fragment: NOTAM console interactions
+    # no longer re-run the TAF fetch/parse/render pipeline)
+    render_taf_section(selected_region, show_all_airports, filtered_airport_data, enroute_data)
+
+
+@st.fragment
+def render_taf_section(selected_region, show_all_airports, filtered_airport_data, enroute_data):
+    """Process and render the destinations and EDTO ERA TAF tables"""
+    destinations_rows = process_destinations_data(filtered_airport_data, show_all_airports, selected_region)
     enroute_rows = process_enroute_data(selected_region, enroute_data, show_all_airports)
-    
-    # Display TAF tables
     display_tables(destinations_rows, enroute_rows, show_all_airports, selected_region)
 
+@st.fragment(run_every="10m")
 def render_notam_console(airport_code):
-    """Render NOTAM information in a high-visibility hero section"""
+    """Render NOTAM information in a high-visibility hero section.
+
+    Runs as a fragment: the 10-minute NOTAM poll and the search input
+    only re-execute this function, not the whole dashboard script.
+    """
     # COMPACT HEADER (One Row)
     # Merging Title, Search, and Close into one row to save vertical space
     col_title, col_search, col_close = st.columns([3, 5, 2])
@@ -209,149 +341,120 @@ def render_notam_console(airport_code):
                 st.session_state.direct_notam_input = ""
 
         if st.button("❌ Close", use_container_width=True, type="primary", on_click=close_notam_callback):
-            st.rerun()
+            # Full-app rerun: a fragment-scoped rerun would leave the
+            # console visible until the next unrelated interaction.
+            st.rerun(scope="app")
 
     try:
         with st.spinner(f"Scanning FAA Data Feed for {airport_code}..."):
-            # Fetch data (Live or Mock)
-            if not st.session_state.notam_client.client_id or st.session_state.notam_client.client_id == "YOUR_CLIENT_ID":
-                # Enhanced Mock with pro-format
+            # Fetch data (Live or Mock); mock detection is computed once
+            # at client init, not re-derived per rerun
+            if st.session_state.get("notam_is_mock"):
                 notams = [
-                    {
-                        "id": "W0164/26 NOTAMN", 
-                        "status": "Active", "start": "2602231700", "end": "2603302200", 
-                        "text": "RWY08L/26R CLSD DUE TO MAINT.",
-                        "full_icao": "GEOJSON",
-                        "q_line": "Q) ZWUQ/QMRLC/IV/NBO/A/000/999/4354N08728E005",
-                        "location": airport_code,
-                        "schedule": "1700-2200 EVERY MON",
-                        "keyword": "QMRLC"
-                    },
-                    {
-                        "id": "B9999/26 NOTAMN", 
-                        "status": "Active", "start": "2602250000", "end": "2602252359", 
-                        "text": "AERODROME CLOSED DUE TO SNOW.",
-                        "full_icao": "GEOJSON",
-                        "q_line": "Q) ZWUQ/QFAXX/IV/NBO/A/000/999/...",
-                        "location": airport_code,
-                        "schedule": "",
-                        "keyword": "QFAXX"
-                    }
+                    dict(n, location=airport_code, q_line=n['q_line'].replace('<LOC>', airport_code))
+                    for n in _MOCK_NOTAMS_TEMPLATE
                 ]
-                time.sleep(0.3)
             else:
-                # Simplified search call (keyword only)
-                notams = st.session_state.notam_client.search_notams(
-                    location=airport_code, 
-                    query=query
-                )
+                # Simplified search call (keyword only), cached for 5 minutes
+                notams = cached_search_notams(airport_code, query)
 
         if not notams:
             st.info(f"No active NOTAMs found for {airport_code} matching your criteria.")
             return
 
-        # REFINED PRIORITY & RUNWAY DETECTION
-        import re
-        from datetime import datetime
-        
-        def get_notam_metrics(n):
-            text = n['text'].upper()
-            q_code = n.get('keyword', '')
-            
-            # Tier 0: Critical Ops via Q-code
-            # Subject (2nd & 3rd letter)
-            # MR = Runway, FA = Aerodrome
-            subject = q_code[1:3] if len(q_code) >= 3 else ""
-            is_top_priority = subject in ['MR', 'FA']
-            
-            # Tier 1: Critical status
-            is_crit = any(x in text for x in ["CLOSED", "CLSD", "U/S", "UNSERVICEABLE"])
-            
-            # Tier 2: General runway mentions
-            is_rwy_mention = bool(re.search(r'\b(RWY|RUNWAY)', text))
-            
-            # Secondary Sort Key: Issue Date (Descending)
-            issued_str = n.get('issued', '')
-            timestamp = 0.0
-            if issued_str:
-                try:
-                    # Parse "2025-05-16T15:37:00Z"
-                    dt = datetime.strptime(issued_str, "%Y-%m-%dT%H:%M:%SZ")
-                    timestamp = dt.timestamp()
-                except Exception:
-                    pass
-            
-            # Priority Score (Primary Sort Key: Lower is higher)
-            # -timestamp used to force descending order for secondary sort
-            if is_top_priority: return 0, -timestamp, subject, is_rwy_mention
-            if is_crit: return 1, -timestamp, subject, is_rwy_mention
-            if is_rwy_mention: return 2, -timestamp, subject, is_rwy_mention
-            return 3, -timestamp, subject, is_rwy_mention
-
-        sorted_notams = sorted(notams, key=lambda x: get_notam_metrics(x))
-
-        st.markdown(f"**Showing {len(sorted_notams)} NOTAMs** (3-Column Power Layout)")
-        
-        # 3-COLUMN TABLE IMPLEMENTATION
-        # Group notams into chunks of 3
-        cols_per_row = 3
-        notam_groups = [sorted_notams[i:i + cols_per_row] for i in range(0, len(sorted_notams), cols_per_row)]
-        
-        # Build Bootstrap Table
-        html_table = '<div class="notam-table-container" style="overflow-x: auto;">'
-        html_table += '<table class="table table-bordered table-sm" style="width: 100%; border-collapse: collapse; font-family: monospace; font-size: 13px;">'
-        html_table += '<tbody>'
-        
-        for group in notam_groups:
-            html_table += '<tr>'
-            for n in group:
-                score, _ts, subject, is_rwy_mention = get_notam_metrics(n)
-                # Highlight based on priority
-                is_top = score == 0
-                bg_color = "#fff0f0" if is_top else ("#fffaf0" if is_rwy_mention else "#ffffff")
-                border_left = "4px solid #d9534f" if is_top else ("4px solid #f0ad4e" if is_rwy_mention else "1px solid #dee2e6")
-                
-                # ICAO Lines
-                q_line = n.get('q_line', f"Q) {n.get('location', 'XXXX')}/XXXXX/IV/NBO/A/000/999/...")
-                a_line = f"A) {n['location']}"
-                b_line = f"B) {n['start']}"
-                c_line = f"C) {n['end']}"
-                d_line = f"D) {n['schedule']}" if n.get('schedule') else ""
-                # Replace actual newlines in text with <br> for HTML rendering
-                e_content = n['text'].replace('\n', '<br>')
-                
-                # Badge logic
-                badge = ""
-                if subject == 'MR':
-                    badge = '<span style="color:#d9534f; font-weight: bold;">[RWY OPS]</span>'
-                elif subject == 'FA':
-                    badge = '<span style="color:#d9534f; font-weight: bold;">[AD OPS]</span>'
-                elif is_rwy_mention:
-                    badge = '<span style="color:#f0ad4e; font-weight: bold;">[RWY]</span>'
-
-                html_table += f'''<td style="width: 33.33%; padding: 10px; vertical-align: top; background-color: {bg_color}; border-left: {border_left}; border-top: 1px solid #dee2e6; font-family: monospace !important; font-size: 13px !important; line-height: 1.3 !important; color: #333;">
+        # Sorting + HTML generation are deterministic in the NOTAM list,
+        # so reruns with unchanged content reuse the cached table. Only
+        # the top-priority head is shipped on first paint; large hubs can
+        # return hundreds of NOTAMs and most users need only the top.
+        total = len(notams)
+        html_table, shown, group_count = _render_notam_html(notams, 0, _NOTAM_HEAD_COUNT)
+
+        st.markdown(f"**Showing {shown} of {total} NOTAMs** (3-Column Power Layout)")
+
+        # Pure-HTML payload: components.html skips the markdown
+        # sanitize/tokenize pass st.markdown would run on every rerun.
+        # All cell styling is inline, so the iframe needs no page CSS.
+        components.html(html_table, height=min(2000, 180 * group_count), scrolling=True)
+
+        if total > _NOTAM_HEAD_COUNT:
+            with st.expander(f"Show {total - _NOTAM_HEAD_COUNT} more NOTAMs"):
+                tail_html, _, tail_groups = _render_notam_html(notams, _NOTAM_HEAD_COUNT, None)
+                components.html(tail_html, height=min(2000, 180 * tail_groups), scrolling=True)
+
+    except Exception as e:
+        st.error(f"⚠️ FAA Data Feed Unreachable: {str(e)}")
+
+
+@st.cache_data(show_spinner=False)
+def _render_notam_html(notams, start=0, stop=None):
+    """Build the prioritized 3-column NOTAM table, cached by content.
+
+    Renders the [start:stop] slice of the sorted list and returns
+    (html, notam_count, row_count).
+    """
+    # REFINED PRIORITY & RUNWAY DETECTION (metrics helper at module scope)
+    # Metrics are computed once per NOTAM and carried through to the
+    # render loop, which previously re-ran the whole regex/membership
+    # pipeline per cell.
+    annotate_notams(notams)
+    metric_pairs = [(get_notam_metrics(n), n) for n in notams]
+    # Two stable passes: newest-issued first within each tier.
+    metric_pairs.sort(key=lambda pair: pair[0][1], reverse=True)
+    metric_pairs.sort(key=lambda pair: pair[0][0])
+    metric_pairs = metric_pairs[start:stop]
+
+    # 3-COLUMN TABLE IMPLEMENTATION
+    # Group notams into chunks of 3
+    cols_per_row = 3
+    notam_groups = [metric_pairs[i:i + cols_per_row] for i in range(0, len(metric_pairs), cols_per_row)]
+
+    # Build Bootstrap Table via list-append + single join (O(cells)
+    # instead of O(cells^2) string copying)
+    parts = [
+        '<div class="notam-table-container" style="overflow-x: auto;">',
+        '<table class="table table-bordered table-sm" style="width: 100%; border-collapse: collapse; font-family: monospace; font-size: 13px;">',
+        '<tbody>'
+    ]
+
+    for group in notam_groups:
+        parts.append('<tr>')
+        for (score, _ts, subject, is_rwy_mention), n in group:
+            # Highlight based on priority
+            is_top = score == 0
+            td_style = _TD_STYLE_TOP if is_top else (_TD_STYLE_RWY if is_rwy_mention else _TD_STYLE_DEFAULT)
+
+            # ICAO Lines
+            q_line = n.get('q_line', f"Q) {n.get('location', 'XXXX')}/XXXXX/IV/NBO/A/000/999/...")
+            a_line = f"A) {n['location']}"
+            b_line = f"B) {n['start']}"
+            c_line = f"C) {n['end']}"
+            d_line = f"D) {n['schedule']}" if n.get('schedule') else ""
+            # Replace actual newlines in text with <br> for HTML rendering
+            e_content = n['text'].replace('\n', '<br>')
+
+            # Badge logic
+            badge = ""
+            if subject == 'MR':
+                badge = '<span style="color:#d9534f; font-weight: bold;">[RWY OPS]</span>'
+            elif subject == 'FA':
+                badge = '<span style="color:#d9534f; font-weight: bold;">[AD OPS]</span>'
+            elif is_rwy_mention:
+                badge = '<span style="color:#f0ad4e; font-weight: bold;">[RWY]</span>'
+
+            parts.append(f'''<td style="{td_style}">
 <div style="font-weight: bold; color: #007bff; margin-bottom: 4px;">{n['id']} {badge}</div>
 {q_line}<br>
 {a_line} {b_line} {c_line}<br>
 {f"{d_line}<br>" if d_line else ""}
 <div style="margin-top: 5px;">E) {e_content}</div>
-</td>'''
-            
-            # Fill remaining cells if row is not full
-            for _ in range(cols_per_row - len(group)):
-                html_table += '<td style="width: 33.33%; border: none;"></td>'
-                
-            html_table += '</tr>'
-            
-        html_table += '</tbody></table></div>'
-        
-        st.markdown(html_table, unsafe_allow_html=True)
+</td>''')
 
-    except Exception as e:
-        st.error(f"⚠️ FAA Data Feed Unreachable: {str(e)}")
+        # Fill remaining cells if row is not full
+        parts.extend([_TD_FILLER] * (cols_per_row - len(group)))
+        parts.append('</tr>')
 
-    # FINAL PIECE: Auto-refresh moved to bottom to prevent top spacing issues
-    st_autorefresh(interval=600000, limit=3000, key="FinalRefreshCounter")
+    parts.append('</tbody></table></div>')
+    return ''.join(parts), len(metric_pairs), len(notam_groups)
 
 
 if __name__ == "__main__":